@@ -5,50 +5,120 @@ unit tests and basic programs. The engine relies on ``JackTokenizer`` for
 tokens and ``VMWriter`` for writing the resulting commands.
 """
 
-from JackTokenizer import JackTokenizer
+from __future__ import annotations
+
+from JackTokenizer import JackSyntaxError, JackTokenizer
 from VMWriter import VMWriter
 from SymbolTable import SymbolTable
 
 
-class JackSyntaxError(Exception):
-    """Raised when the input Jack code has malformed syntax."""
-    pass
+_OPS = frozenset({"+", "-", "*", "/", "&", "|", "<", ">", "=", "<<", ">>"})
+_UNARY_OPS = frozenset({"-", "~"})
+_KW_CONSTS = frozenset({"true", "false", "null", "this"})
+_PRIMITIVE_TYPES = frozenset({"int", "char", "boolean"})
+_CLASS_VAR_KWS = frozenset({"static", "field"})
+_SUBROUTINE_KWS = frozenset({"constructor", "function", "method"})
+
+# Binary operator -> VM arithmetic command.
+_OP_ARITH = {
+    "+": "add",
+    "-": "sub",
+    "&": "and",
+    "|": "or",
+    "<": "lt",
+    ">": "gt",
+    "=": "eq",
+    "<<": "shiftleft",
+    ">>": "shiftright",
+}
+
+# Binary operators implemented by the OS -> (function name, argument count).
+_OP_CALL = {
+    "*": ("Math.multiply", 2),
+    "/": ("Math.divide", 2),
+}
+
+# Token type -> the opening and closing tag text of its XML element.
+_XML_TOKEN_TAGS = {
+    ttype: (f"<{tag}> ", f" </{tag}>\n")
+    for ttype, tag in (
+        ("KEYWORD", "keyword"),
+        ("SYMBOL", "symbol"),
+        ("IDENTIFIER", "identifier"),
+        ("INT_CONST", "integerConstant"),
+        ("STRING_CONST", "stringConstant"),
+    )
+}
+
+# Non-terminal XML tags, pre-formatted for ``XMLEmitEngine``.
+_XML_NONTERMINALS = (
+    "class", "classVarDec", "subroutineDec", "parameterList",
+    "subroutineBody", "varDec", "statements", "letStatement", "ifStatement",
+    "whileStatement", "doStatement", "returnStatement", "expression", "term",
+    "expressionList",
+)
+_XML_OPEN = {tag: f"<{tag}>\n" for tag in _XML_NONTERMINALS}
+_XML_CLOSE = {tag: f"</{tag}>\n" for tag in _XML_NONTERMINALS}
 
 
 class CompilationEngine:
-    def __init__(self, input_stream: JackTokenizer, output_stream) -> None:
+    """Compiles a single Jack class read from a ``JackTokenizer``.
+
+    Instantiating ``CompilationEngine`` returns a ``VMEmitEngine``, which
+    emits VM code, or an ``XMLEmitEngine``, which emits the XML parse tree,
+    according to ``mode`` ("vm" or "xml"). When no mode is given, XML is
+    chosen if the tokenizer has already been advanced. Instantiating a
+    subclass directly with a ``mode`` it does not emit raises ``ValueError``.
+    The output mode is thus fixed by the instance's class rather than checked
+    on every token.
+
+    Each subclass implements ``_compile``, which the constructor calls once
+    the tokenizer is primed to compile the whole class and write the result.
+    """
+
+    __slots__ = (
+        "tokenizer", "writer", "symbol_table", "class_name", "output_stream",
+        "_label_counter", "_cur_type", "_cur_val",
+    )
+
+    def __new__(cls, input_stream: JackTokenizer, output_stream,
+                mode: str | None = None):
+        if cls is CompilationEngine:
+            if mode is None:
+                # A tokenizer that has been advanced prior to constructing
+                # this engine means the caller expects the XML representation
+                # used in the course's "pre-advanced" compiler stage.
+                mode = "xml" if input_stream.is_primed() else "vm"
+            try:
+                cls = _ENGINES[mode]
+            except KeyError:
+                raise ValueError(f"Illegal output mode: {mode}") from None
+        elif mode is not None and _ENGINES.get(mode) is not cls:
+            raise ValueError(f"{cls.__name__} cannot emit mode: {mode}")
+        return super().__new__(cls)
+
+    def __init__(self, input_stream: JackTokenizer, output_stream,
+                 mode: str | None = None) -> None:
         self.tokenizer = input_stream
-
-        # Determine output mode based on whether the tokenizer has been
-        # advanced prior to constructing this engine. If it has, we assume the
-        # caller expects the XML representation used in the course's
-        # "pre-advanced" compiler stage.
-        self.xml_mode = getattr(self.tokenizer, "_current_token", None) is not None
-        self.writer = None if self.xml_mode else VMWriter(output_stream)
         self.symbol_table = SymbolTable()
         self.class_name: str = ""
-
-        # Prime the tokenizer and immediately compile the class. If the
-        # tokenizer has already advanced before this constructor is called,
-        # we should not advance it again.
-
         self.output_stream = output_stream
-        self._indent_count = 0
         self._label_counter = 0
 
+        # Type and value of the current token, refreshed once per advance so
+        # the classification helpers don't have to query the tokenizer.
+        self._cur_type: str = ""
+        self._cur_val: str = ""
+
         # Prime the tokenizer and immediately compile the class so that
         # users of this class only need to instantiate it in order to
         # generate the output. If the tokenizer has already been advanced
         # before this constructor is called, we should not advance it again.
-
-        if getattr(self.tokenizer, "_current_token", None) is None:
-            if self.tokenizer.has_more_tokens():
-                self.tokenizer.advance()
-        if getattr(self.tokenizer, "_current_token", None) is not None:
-            if self.xml_mode:
-                self._compile_class_xml()
-            else:
-                self.compile_class()
+        # Every later advance goes through ``_adv`` so the cached token state
+        # always matches the tokenizer.
+        if self.tokenizer.ensure_primed():
+            self._refresh()
+            self._compile()
 
     # ------------------------------------------------------------------
     # High level compile routines
@@ -65,48 +135,6 @@ class CompilationEngine:
 
         self._expect_value("}")
 
-    # ------------------------------------------------------------------
-    # XML compile routines (minimal implementation for testing)
-    # ------------------------------------------------------------------
-    def _compile_class_xml(self) -> None:
-        self._xml_open("class")
-        self._expect_value("class")
-        self.class_name = self._expect_type("IDENTIFIER")
-        self._expect_value("{")
-        while self._is_subroutine():
-            self._compile_subroutine_xml()
-        self._expect_value("}")
-        self._xml_close("class")
-
-    def _compile_subroutine_xml(self) -> None:
-        self._xml_open("subroutineDec")
-        self._expect_type("KEYWORD")
-        if self._is_keyword("void"):
-            self._expect_type("KEYWORD")
-        else:
-            self._read_type()
-        self._expect_type("IDENTIFIER")
-        self._expect_value("(")
-        self._xml_open("parameterList")
-        # no parameters for the tested programs
-        self._xml_close("parameterList")
-        self._expect_value(")")
-        self._xml_open("subroutineBody")
-        self._expect_value("{")
-        self._xml_open("statements")
-        if self._is_keyword("return"):
-            self._compile_return_xml()
-        self._xml_close("statements")
-        self._expect_value("}")
-        self._xml_close("subroutineBody")
-        self._xml_close("subroutineDec")
-
-    def _compile_return_xml(self) -> None:
-        self._xml_open("returnStatement")
-        self._expect_value("return")
-        self._expect_value(";")
-        self._xml_close("returnStatement")
-
     def compile_class_var_dec(self) -> None:
         kind = self._expect_type("KEYWORD").upper()  # static | field
         var_type = self._read_type()
@@ -150,7 +178,7 @@ class CompilationEngine:
         self._expect_value("}")
 
     def compile_parameter_list(self) -> None:
-        if not self._is_symbol(")"):
+        if not (self._cur_type == "SYMBOL" and self._cur_val == ")"):
             var_type = self._read_type()
             name = self._expect_type("IDENTIFIER")
             self.symbol_table.define(name, var_type, "ARG")
@@ -172,31 +200,25 @@ class CompilationEngine:
         self._expect_value(";")
 
     def compile_statements(self) -> None:
-        while True:
-            if self._is_keyword("let"):
-                self.compile_let()
-            elif self._is_keyword("do"):
-                self.compile_do()
-            elif self._is_keyword("return"):
-                self.compile_return()
-            elif self._is_keyword("while"):
-                self.compile_while()
-            elif self._is_keyword("if"):
-                self.compile_if()
-            else:
-                break
+        while self._cur_type == "KEYWORD" and \
+                (handler := _STMT_DISPATCH.get(self._cur_val)) is not None:
+            handler(self)
 
     # ------------------------------------------------------------------
     # Statements
     # ------------------------------------------------------------------
+    # Each statement routine must be entered with its keyword as the current
+    # token (``compile_statements`` dispatches on it), so it only needs to
+    # step past it without checking it again.
     def compile_do(self) -> None:
-        self._expect_value("do")
+        self._adv()
         self.compile_subroutine_call()
         self.writer.write_pop("TEMP", 0)
         self._expect_value(";")
 
     def compile_let(self) -> None:
-        self._expect_value("let")
+        self._adv()
+        writer = self.writer
         name = self._expect_type("IDENTIFIER")
         is_array = False
         if self._is_symbol("["):
@@ -205,21 +227,22 @@ class CompilationEngine:
             self.compile_expression()
             self._expect_value("]")
             self._push_var(name)
-            self.writer.write_arithmetic("add")
+            writer.write_arithmetic("add")
         self._expect_value("=")
         self.compile_expression()
         self._expect_value(";")
 
         if is_array:
-            self.writer.write_pop("TEMP", 0)
-            self.writer.write_pop("POINTER", 1)
-            self.writer.write_push("TEMP", 0)
-            self.writer.write_pop("THAT", 0)
+            write_pop = writer.write_pop
+            write_pop("TEMP", 0)
+            write_pop("POINTER", 1)
+            writer.write_push("TEMP", 0)
+            write_pop("THAT", 0)
         else:
             self._pop_var(name)
 
     def compile_return(self) -> None:
-        self._expect_value("return")
+        self._adv()
         if not self._is_symbol(";"):
             self.compile_expression()
         else:
@@ -228,76 +251,77 @@ class CompilationEngine:
         self.writer.write_return()
 
     def compile_while(self) -> None:
-        self._expect_value("while")
+        self._adv()
+        writer = self.writer
         start_label = self._new_label("WHILE_EXP")
         end_label = self._new_label("WHILE_END")
-        self.writer.write_label(start_label)
+        writer.write_label(start_label)
         self._expect_value("(")
         self.compile_expression()
         self._expect_value(")")
-        self.writer.write_arithmetic("not")
-        self.writer.write_if(end_label)
+        writer.write_arithmetic("not")
+        writer.write_if(end_label)
         self._expect_value("{")
         self.compile_statements()
         self._expect_value("}")
-        self.writer.write_goto(start_label)
-        self.writer.write_label(end_label)
+        writer.write_goto(start_label)
+        writer.write_label(end_label)
 
     def compile_if(self) -> None:
-        self._expect_value("if")
+        self._adv()
+        writer = self.writer
         true_label = self._new_label("IF_TRUE")
         false_label = self._new_label("IF_FALSE")
         end_label = self._new_label("IF_END")
         self._expect_value("(")
         self.compile_expression()
         self._expect_value(")")
-        self.writer.write_if(true_label)
-        self.writer.write_goto(false_label)
-        self.writer.write_label(true_label)
+        writer.write_if(true_label)
+        writer.write_goto(false_label)
+        writer.write_label(true_label)
         self._expect_value("{")
         self.compile_statements()
         self._expect_value("}")
         if self._is_keyword("else"):
-            self.writer.write_goto(end_label)
-            self.writer.write_label(false_label)
+            writer.write_goto(end_label)
+            writer.write_label(false_label)
             self._expect_value("else")
             self._expect_value("{")
             self.compile_statements()
             self._expect_value("}")
-            self.writer.write_label(end_label)
+            writer.write_label(end_label)
         else:
-            self.writer.write_label(false_label)
+            writer.write_label(false_label)
 
     # ------------------------------------------------------------------
     # Expressions
     # ------------------------------------------------------------------
     def compile_expression(self) -> None:
-        self.compile_term()
+        compile_term = self.compile_term
+        compile_term()
         while self._is_op():
             op = self._expect_type("SYMBOL")
-            self.compile_term()
+            compile_term()
             self._write_arithmetic(op)
 
     def compile_term(self) -> None:
+        writer = self.writer
         if self._is_integer_constant():
-            val = int(self._expect_type("INT_CONST"))
-            self.writer.write_push("CONST", val)
+            # The token text is already a normalized decimal integer, so it
+            # is emitted as is rather than round-tripped through int().
+            writer.write_push("CONST", self._expect_type("INT_CONST"))
         elif self._is_string_constant():
             text = self._expect_type("STRING_CONST")
-            self.writer.write_push("CONST", len(text))
-            self.writer.write_call("String.new", 1)
-            for ch in text:
-                self.writer.write_push("CONST", ord(ch))
-                self.writer.write_call("String.appendChar", 2)
+            writer.write_string(text)
         elif self._is_keyword_constant():
             kw = self._expect_type("KEYWORD")
             if kw in ("false", "null"):
-                self.writer.write_push("CONST", 0)
+                writer.write_push("CONST", 0)
             elif kw == "true":
-                self.writer.write_push("CONST", 0)
-                self.writer.write_arithmetic("not")
+                writer.write_push("CONST", 0)
+                writer.write_arithmetic("not")
             elif kw == "this":
-                self.writer.write_push("POINTER", 0)
+                writer.write_push("POINTER", 0)
         elif self._is_symbol("("):
             self._expect_value("(")
             self.compile_expression()
@@ -306,20 +330,21 @@ class CompilationEngine:
             op = self._expect_type("SYMBOL")
             self.compile_term()
             if op == "-":
-                self.writer.write_arithmetic("neg")
+                writer.write_arithmetic("neg")
             else:
-                self.writer.write_arithmetic("not")
+                writer.write_arithmetic("not")
         elif self._is_identifier():
             ident = self._expect_type("IDENTIFIER")
-            if self._is_symbol("["):
+            nxt = self._cur_val if self._cur_type == "SYMBOL" else None
+            if nxt == "[":
                 self._expect_value("[")
                 self.compile_expression()
                 self._expect_value("]")
                 self._push_var(ident)
-                self.writer.write_arithmetic("add")
-                self.writer.write_pop("POINTER", 1)
-                self.writer.write_push("THAT", 0)
-            elif self._is_symbol("(") or self._is_symbol("."):
+                writer.write_arithmetic("add")
+                writer.write_pop("POINTER", 1)
+                writer.write_push("THAT", 0)
+            elif nxt == "(" or nxt == ".":
                 self._compile_subroutine_call_with_peek(ident)
             else:
                 self._push_var(ident)
@@ -328,7 +353,7 @@ class CompilationEngine:
 
     def compile_expression_list(self) -> int:
         n_args = 0
-        if not self._is_symbol(")"):
+        if not (self._cur_type == "SYMBOL" and self._cur_val == ")"):
             self.compile_expression()
             n_args += 1
             while self._is_symbol(","):
@@ -351,15 +376,16 @@ class CompilationEngine:
         if self._is_symbol("."):
             self._expect_value(".")
             sub_name = self._expect_type("IDENTIFIER")
-            if self.symbol_table.kind_of(first):
-                self._push_var(first)
-                obj_type = self.symbol_table.type_of(first)
-                full_name = f"{obj_type}.{sub_name}"
+            location = self.symbol_table.resolve_with_type(first)
+            if location is not None:
+                segment, index, obj_type = location
+                self.writer.write_push(segment, index)
+                full_name = obj_type + "." + sub_name
                 n_args += 1
             else:
-                full_name = f"{first}.{sub_name}"
+                full_name = first + "." + sub_name
         else:
-            full_name = f"{self.class_name}.{first}"
+            full_name = self.class_name + "." + first
             self.writer.write_push("POINTER", 0)
             n_args += 1
         self._expect_value("(")
@@ -368,150 +394,216 @@ class CompilationEngine:
         self.writer.write_call(full_name, n_args)
 
     def _push_var(self, name: str) -> None:
-        kind = self.symbol_table.kind_of(name)
-        segment = self._kind_to_segment(kind)
-        index = self.symbol_table.index_of(name)
-        self.writer.write_push(segment, index)
+        self.writer.write_push(*self._resolve_var(name))
 
     def _pop_var(self, name: str) -> None:
-        kind = self.symbol_table.kind_of(name)
-        segment = self._kind_to_segment(kind)
-        index = self.symbol_table.index_of(name)
-        self.writer.write_pop(segment, index)
-
-    @staticmethod
-    def _kind_to_segment(kind: str) -> str:
-        return {
-            "STATIC": "STATIC",
-            "FIELD": "THIS",
-            "ARG": "ARG",
-            "VAR": "LOCAL",
-        }[kind]
+        self.writer.write_pop(*self._resolve_var(name))
+
+    def _resolve_var(self, name: str) -> tuple[str, int]:
+        location = self.symbol_table.resolve(name)
+        if location is None:
+            raise JackSyntaxError(f"Undefined variable {name!r}")
+        return location
 
     def _write_arithmetic(self, op: str) -> None:
-        mapping = {
-            "+": "add",
-            "-": "sub",
-            "*": ("call", "Math.multiply", 2),
-            "/": ("call", "Math.divide", 2),
-            "&": "and",
-            "|": "or",
-            "<": "lt",
-            ">": "gt",
-            "=": "eq",
-            "<<": "shiftleft",
-            ">>": "shiftright",
-        }
-        cmd = mapping[op]
-        if isinstance(cmd, tuple):
-            _, name, n = cmd
-            self.writer.write_call(name, n)
-        else:
+        cmd = _OP_ARITH.get(op)
+        if cmd is not None:
             self.writer.write_arithmetic(cmd)
+        else:
+            self.writer.write_call(*_OP_CALL[op])
 
     def _new_label(self, base: str) -> str:
-        label = f"{base}{self._label_counter}"
+        label = base + str(self._label_counter)
         self._label_counter += 1
         return label
 
-    # ------------------------------------------------------------------
-    # XML output helpers
-    # ------------------------------------------------------------------
-    def _xml_write_line(self, text: str) -> None:
-        self.output_stream.write("  " * self._indent_count + text + "\n")
-
-    def _xml_open(self, tag: str) -> None:
-        self._xml_write_line(f"<{tag}>")
-        self._indent_count += 1
-
-    def _xml_close(self, tag: str) -> None:
-        self._xml_write_line(f"</{tag}>")
-        self._indent_count -= 1
-
-    def _xml_write_token(self, ttype: str, value: str) -> None:
-        tag = {
-            "KEYWORD": "keyword",
-            "SYMBOL": "symbol",
-            "IDENTIFIER": "identifier",
-            "INT_CONST": "integerConstant",
-            "STRING_CONST": "stringConstant",
-        }.get(ttype, ttype.lower())
-        self._xml_write_line(f"<{tag}> {value} </{tag}>")
-
     # ------------------------------------------------------------------
     # Token handling helpers
     # ------------------------------------------------------------------
     def _read_type(self, allow_void: bool = False) -> str:
-        if self._is_keyword("void") and allow_void:
-            return self._expect_type("KEYWORD")
-        if self._is_keyword("int") or self._is_keyword("char") or \
-           self._is_keyword("boolean"):
+        if self._cur_type == "KEYWORD" and (
+                self._cur_val in _PRIMITIVE_TYPES or
+                (allow_void and self._cur_val == "void")):
             return self._expect_type("KEYWORD")
         return self._expect_type("IDENTIFIER")
 
+    def _refresh(self) -> None:
+        self._cur_type = self.tokenizer.token_type()
+        self._cur_val = self.tokenizer.get_token_string()
+
+    def _adv(self) -> None:
+        self.tokenizer.advance()
+        self._refresh()
+
     def _expect_type(self, ttype: str) -> str:
-        if self.tokenizer.token_type() != ttype:
+        if self._cur_type != ttype:
             raise JackSyntaxError(
-                f"Expected {ttype}, got {self.tokenizer.token_type()}"
+                f"Expected {ttype}, got {self._cur_type}"
             )
-        value = self.tokenizer.get_token_string()
-        if self.xml_mode:
-            self._xml_write_token(ttype, value)
-        self.tokenizer.advance()
+        value = self._cur_val
+        self._adv()
         return value
 
     def _expect_value(self, value: str) -> None:
-        if self.tokenizer.get_token_string() != value:
+        if self._cur_val != value:
             raise JackSyntaxError(
-                f"Expected '{value}', got '{self.tokenizer.get_token_string()}'"
+                f"Expected '{value}', got '{self._cur_val}'"
             )
-        if self.xml_mode:
-            self._xml_write_token(self.tokenizer.token_type(), value)
-        self.tokenizer.advance()
+        self._adv()
 
     # ------------------------------------------------------------------
     # Token classification helpers (mostly copied from the previous version)
     # ------------------------------------------------------------------
     def _is_class_var_dec(self) -> bool:
-        return self._is_keyword("static") or self._is_keyword("field")
+        return self._cur_type == "KEYWORD" and self._cur_val in _CLASS_VAR_KWS
 
     def _is_subroutine(self) -> bool:
-        return (self._is_keyword("constructor") or
-                self._is_keyword("function") or
-                self._is_keyword("method"))
+        return self._cur_type == "KEYWORD" and self._cur_val in _SUBROUTINE_KWS
 
     def _is_var_dec(self) -> bool:
         return self._is_keyword("var")
 
     def _is_keyword(self, keyword: str) -> bool:
-        return self.tokenizer.token_type() == "KEYWORD" and \
-               self.tokenizer.get_token_string() == keyword
+        return self._cur_type == "KEYWORD" and self._cur_val == keyword
 
     def _is_symbol(self, symbol: str) -> bool:
-        return self.tokenizer.token_type() == "SYMBOL" and \
-               self.tokenizer.get_token_string() == symbol
+        return self._cur_type == "SYMBOL" and self._cur_val == symbol
 
     def _is_integer_constant(self) -> bool:
-        return self.tokenizer.token_type() == "INT_CONST"
+        return self._cur_type == "INT_CONST"
 
     def _is_string_constant(self) -> bool:
-        return self.tokenizer.token_type() == "STRING_CONST"
+        return self._cur_type == "STRING_CONST"
 
     def _is_identifier(self) -> bool:
-        return self.tokenizer.token_type() == "IDENTIFIER"
+        return self._cur_type == "IDENTIFIER"
 
     def _is_keyword_constant(self) -> bool:
-        return self.tokenizer.token_type() == "KEYWORD" and \
-               self.tokenizer.get_token_string() in {"true", "false", "null", "this"}
+        return self._cur_type == "KEYWORD" and self._cur_val in _KW_CONSTS
 
     def _is_unary_op(self) -> bool:
-        return self.tokenizer.token_type() == "SYMBOL" and \
-               self.tokenizer.get_token_string() in {"-", "~"}
+        return self._cur_type == "SYMBOL" and self._cur_val in _UNARY_OPS
 
     def _is_op(self) -> bool:
-        return (
-            self.tokenizer.token_type() == "SYMBOL"
-            and self.tokenizer.get_token_string()
-            in {"+", "-", "*", "/", "&", "|", "<", ">", "=", "<<", ">>"}
-        )
+        return self._cur_type == "SYMBOL" and self._cur_val in _OPS
+
+
+class VMEmitEngine(CompilationEngine):
+    """Compilation engine that writes VM code through a ``VMWriter``."""
+
+    __slots__ = ()
+
+    def __init__(self, input_stream: JackTokenizer, output_stream,
+                 mode: str | None = None) -> None:
+        self.writer = VMWriter(output_stream)
+        super().__init__(input_stream, output_stream)
+
+    def _compile(self) -> None:
+        self.compile_class()
+        self.writer.close()
+
+
+class XMLEmitEngine(CompilationEngine):
+    """Compilation engine that writes the XML parse tree of the class."""
+
+    __slots__ = ("_indent_str", "_xml_buf")
+
+    def __init__(self, input_stream: JackTokenizer, output_stream,
+                 mode: str | None = None) -> None:
+        self.writer = None
+        self._indent_str = ""
+        # XML lines are collected here and written out once the class has
+        # been compiled.
+        self._xml_buf: list[str] = []
+        super().__init__(input_stream, output_stream)
+
+    def _compile(self) -> None:
+        self._compile_class_xml()
+        self.output_stream.write("".join(self._xml_buf))
+        self._xml_buf.clear()
+
+    def _expect_type(self, ttype: str) -> str:
+        value = super()._expect_type(ttype)
+        self._xml_write_token(ttype, value)
+        return value
+
+    def _expect_value(self, value: str) -> None:
+        ttype = self._cur_type
+        super()._expect_value(value)
+        self._xml_write_token(ttype, value)
+
+    # ------------------------------------------------------------------
+    # XML compile routines (minimal implementation for testing)
+    # ------------------------------------------------------------------
+    def _compile_class_xml(self) -> None:
+        self._xml_open("class")
+        self._expect_value("class")
+        self.class_name = self._expect_type("IDENTIFIER")
+        self._expect_value("{")
+        while self._is_subroutine():
+            self._compile_subroutine_xml()
+        self._expect_value("}")
+        self._xml_close("class")
+
+    def _compile_subroutine_xml(self) -> None:
+        self._xml_open("subroutineDec")
+        self._expect_type("KEYWORD")
+        if self._is_keyword("void"):
+            self._expect_type("KEYWORD")
+        else:
+            self._read_type()
+        self._expect_type("IDENTIFIER")
+        self._expect_value("(")
+        self._xml_open("parameterList")
+        # no parameters for the tested programs
+        self._xml_close("parameterList")
+        self._expect_value(")")
+        self._xml_open("subroutineBody")
+        self._expect_value("{")
+        self._xml_open("statements")
+        if self._is_keyword("return"):
+            self._compile_return_xml()
+        self._xml_close("statements")
+        self._expect_value("}")
+        self._xml_close("subroutineBody")
+        self._xml_close("subroutineDec")
+
+    def _compile_return_xml(self) -> None:
+        self._xml_open("returnStatement")
+        self._expect_value("return")
+        self._expect_value(";")
+        self._xml_close("returnStatement")
 
+    # ------------------------------------------------------------------
+    # XML output helpers
+    # ------------------------------------------------------------------
+    def _xml_open(self, tag: str) -> None:
+        self._xml_buf.append(
+            self._indent_str + (_XML_OPEN.get(tag) or f"<{tag}>\n"))
+        self._indent_str += "  "
+
+    def _xml_close(self, tag: str) -> None:
+        self._xml_buf.append(
+            self._indent_str + (_XML_CLOSE.get(tag) or f"</{tag}>\n"))
+        self._indent_str = self._indent_str[:-2]
+
+    def _xml_write_token(self, ttype: str, value: str) -> None:
+        open_tag, close_tag = _XML_TOKEN_TAGS[ttype]
+        self._xml_buf.append("".join(
+            (self._indent_str, open_tag, value, close_tag)))
+
+
+# Statement keyword -> compile routine, used by ``compile_statements``.
+_STMT_DISPATCH = {
+    "let": CompilationEngine.compile_let,
+    "do": CompilationEngine.compile_do,
+    "return": CompilationEngine.compile_return,
+    "while": CompilationEngine.compile_while,
+    "if": CompilationEngine.compile_if,
+}
+
+# Output mode -> engine class, used by ``CompilationEngine.__new__``.
+_ENGINES = {
+    "vm": VMEmitEngine,
+    "xml": XMLEmitEngine,
+}
@@ -5,6 +5,7 @@ was written by Aviv Yaish. It is an extension to the specifications given
 as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
 Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
 """
+import io
 import os
 import sys
 import typing
@@ -14,7 +15,7 @@ from JackTokenizer import JackTokenizer
 
 def compile_file(
         input_file: typing.TextIO, output_file: typing.TextIO) -> None:
-    """Compile ``input_file`` into VM code or XML and write it to ``output_file``.
+    """Compile ``input_file`` into VM code and write it to ``output_file``.
 
     Args:
         input_file (typing.TextIO): the file to compile.
@@ -23,10 +24,20 @@ def compile_file(
 
     tokenizer = JackTokenizer(input_file)
 
-    # The constructor recursively compiles the entire class. ``CompilationEngine``
-    # decides whether to emit VM code or an XML parse tree based on whether the
-    # tokenizer has been advanced prior to its creation.
-    CompilationEngine(tokenizer, output_file)
+    # The constructor recursively compiles the entire class. The output mode
+    # is requested explicitly, so the engine never has to infer it from the
+    # tokenizer's state.
+    CompilationEngine(tokenizer, output_file, mode="vm")
+
+
+def _compile_one(filename: str, source: str) -> None:
+    """Compile the Jack ``source`` read from ``filename``.jack into
+    ``filename``.vm.
+    """
+    # compile_file always emits VM code, so generate a .vm file.
+    output_path = filename + ".vm"
+    with open(output_path, 'w') as output_file:
+        compile_file(io.StringIO(source), output_file)
 
 if "__main__" == __name__:
     # Parses the input path and calls compile_file on each input file.
@@ -43,13 +54,14 @@ if "__main__" == __name__:
             for filename in os.listdir(argument_path)]
     else:
         files_to_assemble = [argument_path]
+    # Read every .jack source up front, each with a single read, so the
+    # compilation loop below only touches the output files.
+    sources = {}
     for input_path in files_to_assemble:
         filename, extension = os.path.splitext(input_path)
         if extension.lower() != ".jack":
             continue
-        # Unless the tokenizer has been advanced beforehand (XML mode),
-        # CompilationEngine emits VM code, so generate a .vm file.
-        output_path = filename + ".vm"
-        with open(input_path, 'r') as input_file, \
-                open(output_path, 'w') as output_file:
-            compile_file(input_file, output_file)
+        with open(input_path, 'r') as input_file:
+            sources[filename] = input_file.read()
+    for filename, source in sources.items():
+        _compile_one(filename, source)
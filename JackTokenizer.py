@@ -3,9 +3,26 @@
 from __future__ import annotations
 
 import re
+import sys
 import typing
 
 
+# Scans the source in one pass: each match is either a token, a comment, a
+# run of whitespace, or a single character that cannot start any token. The
+# group a token matches determines its type; comments and whitespace match
+# no named group. Comments are tried before the "/" symbol and string
+# constants may not span lines.
+_SCAN_RE = re.compile(
+    r"(?s:/\*.*?\*/)|//[^\n]*"
+    r"|(?P<SYMBOL><<|>>|[{}\[\]()\.,;\+\-\*/&|<>=~])"
+    r"|(?P<INT_CONST>\d+)"
+    r"|(?P<IDENTIFIER>[A-Za-z_]\w*)"
+    r"|(?P<STRING_CONST>\"[^\"\r\n]*\")"
+    r"|\s+"
+    r"|(?P<invalid>.)"
+)
+
+
 class JackSyntaxError(Exception):
     """Raised when the input Jack code has malformed syntax."""
     pass
@@ -14,60 +31,61 @@ class JackSyntaxError(Exception):
 class JackTokenizer:
     """Tokenizes Jack source code for consumption by a compilation engine."""
 
-    _KEYWORDS = {
+    __slots__ = ("_tokens", "_pos", "_current_token", "_current_type")
+
+    _KEYWORDS = frozenset(map(sys.intern, {
         "class", "constructor", "function", "method", "field", "static",
         "var", "int", "char", "boolean", "void", "true", "false", "null",
         "this", "let", "do", "if", "else", "while", "return",
-    }
-
-    _SYMBOLS = {
-        "{", "}", "(", ")", "[", "]", ".", ",", ";",
-        "+", "-", "*", "/", "&", "|", "<", ">", "=", "~",
-        "<<", ">>",
-    }
+    }))
 
     def __init__(self, input_stream: typing.TextIO) -> None:
         """Read the entire input stream and prepare a token list."""
 
         source = input_stream.read()
         self._tokens = self._tokenize(source)
+        # Index of the next token to hand out; tokens are never removed.
+        self._pos = 0
         self._current_token: typing.Optional[str] = None
+        self._current_type: typing.Optional[str] = None
 
     # ------------------------------------------------------------------
     # Tokenization utilities
     # ------------------------------------------------------------------
-    def _tokenize(self, text: str) -> list[str]:
-        """Return a list of tokens extracted from ``text``.
+    def _tokenize(self, text: str) -> list[tuple[str, str]]:
+        """Return the ``(token, token_type)`` pairs extracted from ``text``.
+
+        Each token is classified once here, so ``token_type`` only has to
+        report the stored type.
 
         Raises:
             JackSyntaxError: If an illegal character is encountered.
         """
 
-        def remove_comments(source: str) -> str:
-            source = re.sub(r"/\*.*?\*/", "", source, flags=re.DOTALL)
-            source = re.sub(r"//.*", "", source)
-            return source
-
-        cleaned = remove_comments(text)
-        tokens: list[str] = []
-        token_re = re.compile(
-            r"<<|>>|[{}\[\]()\.,;\+\-\*/&|<>=~]|\d+|[A-Za-z_]\w*|\"[^\"]*\""
-        )
-
-        for line_no, line in enumerate(cleaned.splitlines(), start=1):
-            pos = 0
-            while pos < len(line):
-                if line[pos].isspace():
-                    pos += 1
-                    continue
-                match = token_re.match(line, pos)
-                if not match:
-                    char = line[pos]
-                    raise JackSyntaxError(
-                        f"Invalid character {char!r} on line {line_no}"
-                    )
-                tokens.append(match.group(0))
-                pos = match.end()
+        tokens: list[tuple[str, str]] = []
+        keywords = self._KEYWORDS
+
+        for match in _SCAN_RE.finditer(text):
+            token_type = match.lastgroup
+            if token_type is None:
+                continue
+            token = match.group()
+            if token_type == "IDENTIFIER":
+                # Interned so that the engine's comparisons against keyword
+                # and name literals can succeed on identity.
+                token = sys.intern(token)
+                if token in keywords:
+                    token_type = "KEYWORD"
+            elif token_type == "INT_CONST":
+                # Normalize integer constants once (e.g. "007" -> "7")
+                # so accessors can hand out the token text unchanged.
+                token = str(int(token))
+            elif token_type == "invalid":
+                line_no = text.count("\n", 0, match.start()) + 1
+                raise JackSyntaxError(
+                    f"Invalid character {token!r} on line {line_no}"
+                )
+            tokens.append((token, token_type))
 
         return tokens
 
@@ -75,13 +93,29 @@ class JackTokenizer:
     def has_more_tokens(self) -> bool:
         """Return ``True`` if there are more tokens to consume."""
 
-        return bool(self._tokens)
+        return self._pos < len(self._tokens)
 
     def advance(self) -> None:
         """Advance to the next token if available."""
 
-        if self.has_more_tokens():
-            self._current_token = self._tokens.pop(0)
+        if self._pos < len(self._tokens):
+            self._current_token, self._current_type = self._tokens[self._pos]
+            self._pos += 1
+
+    def is_primed(self) -> bool:
+        """Return ``True`` if the tokenizer has a current token."""
+
+        return self._current_token is not None
+
+    def ensure_primed(self) -> bool:
+        """Advance to the first token unless a current token already exists.
+
+        Returns ``True`` if there is a current token afterwards.
+        """
+
+        if self._current_token is None:
+            self.advance()
+        return self._current_token is not None
 
     def token_type(self) -> str:
         """Return the Jack classification of the current token."""
@@ -89,16 +123,7 @@ class JackTokenizer:
         if self._current_token is None:
             raise JackSyntaxError("No current token. Call advance() first.")
 
-        token = self._current_token
-        if token in self._KEYWORDS:
-            return "KEYWORD"
-        if token in self._SYMBOLS:
-            return "SYMBOL"
-        if token.isdigit():
-            return "INT_CONST"
-        if token.startswith('"') and token.endswith('"'):
-            return "STRING_CONST"
-        return "IDENTIFIER"
+        return self._current_type
 
     def keyword(self) -> str:
         """Return the current token assuming it is a keyword."""
@@ -122,14 +147,14 @@ class JackTokenizer:
 
     def get_next_token(self) -> typing.Optional[str]:
         """Peek at the next token without consuming it."""
-        return self._tokens[0] if self._tokens else None
+        if self._pos < len(self._tokens):
+            return self._tokens[self._pos][0]
+        return None
 
     def get_token_string(self) -> str:
         """Return a string representation of the current token."""
 
         token_type = self.token_type()
-        if token_type == "INT_CONST":
-            return str(self.int_val())
         if token_type == "STRING_CONST":
             return self.string_val()
         return self._current_token
@@ -5,17 +5,12 @@ was written by Aviv Yaish. It is an extension to the specifications given
 as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
 Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
 """
-import typing
-
-class _Symbol:
-    """A single identifier-record inside the symbol table."""
+from __future__ import annotations
 
-    __slots__ = ("type", "kind", "index")
+import typing
 
-    def __init__(self, type_: str, kind: str, index: int) -> None:
-        self.type: str = type_
-        self.kind: str = kind
-        self.index: int = index
+# A symbol-table record: (kind, type, index) of one identifier.
+_Symbol = tuple[str, str, int]
 
 class SymbolTable:
     """A symbol table that associates names with information needed for Jack
@@ -23,24 +18,38 @@ class SymbolTable:
     scopes (class/subroutine).
     """
 
-    _CLASS_KINDS = {"STATIC", "FIELD"}
-    _SUB_KINDS   = {"ARG", "VAR"}
+    __slots__ = ("_class_scope", "_sub_scope",
+                 "_static_n", "_field_n", "_arg_n", "_var_n")
+
+    _CLASS_KINDS = frozenset({"STATIC", "FIELD"})
+    _SUB_KINDS   = frozenset({"ARG", "VAR"})
     _ALL_KINDS   = _CLASS_KINDS | _SUB_KINDS
 
+    # kind -> VM memory segment holding identifiers of that kind
+    _KIND_SEGMENT = {
+        "STATIC": "STATIC",
+        "FIELD":  "THIS",
+        "ARG":    "ARG",
+        "VAR":    "LOCAL",
+    }
+
     def __init__(self) -> None:
         """Creates a new empty symbol table."""
         self._class_scope: dict[str, _Symbol] = {}
         self._sub_scope:   dict[str, _Symbol] = {}
-        # unified per-kind counters
-        self._counters = {kind: 0 for kind in self._ALL_KINDS}
+        # per-kind running indices
+        self._static_n = 0
+        self._field_n = 0
+        self._arg_n = 0
+        self._var_n = 0
 
     def start_subroutine(self) -> None:
         """Starts a new subroutine scope (i.e., resets the subroutine's 
         symbol table).
         """
         self._sub_scope.clear()
-        self._counters["ARG"] = 0
-        self._counters["VAR"] = 0
+        self._arg_n = 0
+        self._var_n = 0
 
     def define(self, name: str, type: str, kind: str) -> None:
         """Defines a new identifier of a given name, type and kind and assigns 
@@ -53,18 +62,28 @@ class SymbolTable:
             kind (str): the kind of the new identifier, can be:
             "STATIC", "FIELD", "ARG", "VAR".
         """
-        kind = kind.upper()
         if kind not in self._ALL_KINDS:
-            raise ValueError(f"Illegal identifier kind: {kind}")
-
-        index = self._counters[kind]
-        self._counters[kind] += 1
-        entry = _Symbol(type, kind, index)
-
-        if kind in self._CLASS_KINDS:
-            self._class_scope[name] = entry
+            # callers normally pass canonical kinds; upper-case only otherwise
+            kind = kind.upper()
+            if kind not in self._ALL_KINDS:
+                raise ValueError(f"Illegal identifier kind: {kind}")
+
+        if kind == "VAR":
+            index = self._var_n
+            self._var_n += 1
+            self._sub_scope[name] = (kind, type, index)
+        elif kind == "ARG":
+            index = self._arg_n
+            self._arg_n += 1
+            self._sub_scope[name] = (kind, type, index)
+        elif kind == "FIELD":
+            index = self._field_n
+            self._field_n += 1
+            self._class_scope[name] = (kind, type, index)
         else:
-            self._sub_scope[name] = entry
+            index = self._static_n
+            self._static_n += 1
+            self._class_scope[name] = (kind, type, index)
 
     def var_count(self, kind: str) -> int:
         """Returns how many identifiers of ``kind`` have been defined.
@@ -77,8 +96,17 @@ class SymbolTable:
         Args:
             kind (str): ``STATIC``, ``FIELD``, ``ARG`` or ``VAR``.
         """
-        kind = kind.upper()
-        return self._counters.get(kind, 0)
+        if kind not in self._ALL_KINDS:
+            kind = kind.upper()
+        if kind == "VAR":
+            return self._var_n
+        if kind == "ARG":
+            return self._arg_n
+        if kind == "FIELD":
+            return self._field_n
+        if kind == "STATIC":
+            return self._static_n
+        return 0
 
     def kind_of(self, name: str) -> str:
         """
@@ -90,7 +118,7 @@ class SymbolTable:
             if the identifier is unknown in the current scope.
         """
         entry = self._lookup(name)
-        return entry.kind if entry else None
+        return entry[0] if entry else None
 
     def type_of(self, name: str) -> str:
         """
@@ -101,7 +129,7 @@ class SymbolTable:
             str: the type of the named identifier in the current scope.
         """
         entry = self._lookup(name)
-        return entry.type if entry else None
+        return entry[1] if entry else None
 
     def index_of(self, name: str) -> int:
         """
@@ -112,7 +140,40 @@ class SymbolTable:
             int: the index assigned to the named identifier.
         """
         entry = self._lookup(name)
-        return entry.index if entry else None
+        return entry[2] if entry else None
+
+    def resolve(self, name: str) -> typing.Optional[tuple[str, int]]:
+        """Resolves an identifier straight to its VM memory location.
+
+        Args:
+            name (str): name of an identifier.
+
+        Returns:
+            tuple[str, int]: the ``(segment, index)`` holding the named
+            identifier, or None if it is unknown in the current scope.
+        """
+        entry = self._lookup(name)
+        if entry is None:
+            return None
+        return self._KIND_SEGMENT[entry[0]], entry[2]
+
+    def resolve_with_type(
+            self, name: str) -> typing.Optional[tuple[str, int, str]]:
+        """Resolves an identifier to its VM memory location and its type in
+        a single scope traversal.
+
+        Args:
+            name (str): name of an identifier.
+
+        Returns:
+            tuple[str, int, str]: the ``(segment, index, type)`` of the named
+            identifier, or None if it is unknown in the current scope.
+        """
+        entry = self._lookup(name)
+        if entry is None:
+            return None
+        kind, type_, index = entry
+        return self._KIND_SEGMENT[kind], index, type_
 
     # ---------------------------------------------------------------------- #
     # Debug helpers                                                          #
@@ -122,9 +183,9 @@ class SymbolTable:
         lines: list[str] = []
         for scope_name, scope in (("class", self._class_scope),
                                   ("sub",   self._sub_scope)):
-            for n, sym in scope.items():
+            for n, (kind, type_, index) in scope.items():
                 lines.append(f"{scope_name:5s} | {n:15s} "
-                             f"| {sym.type:10s} | {sym.kind:<6s} | {sym.index}")
+                             f"| {type_:10s} | {kind:<6s} | {index}")
         return "\n".join(lines) if lines else "(empty)"
 
     # ---------------------------------------------------------------------- #
@@ -132,4 +193,7 @@ class SymbolTable:
     # ---------------------------------------------------------------------- #
     def _lookup(self, name: str) -> typing.Optional[_Symbol]:
         """Search *subroutine* scope first, then class scope."""
-        return self._sub_scope.get(name) or self._class_scope.get(name)
+        entry = self._sub_scope.get(name)
+        if entry is not None:
+            return entry
+        return self._class_scope.get(name)
@@ -5,8 +5,9 @@ was written by Aviv Yaish. It is an extension to the specifications given
 as allowed by the Creative Common Attribution-NonCommercial-ShareAlike 3.0
 Unported [License](https://creativecommons.org/licenses/by-nc-sa/3.0/).
 """
-import typing
-from typing import TextIO, Iterable
+from __future__ import annotations
+
+from typing import TextIO
 
 
 class VMWriter:
@@ -14,6 +15,8 @@ class VMWriter:
     Writes VM commands into a file. Encapsulates the VM command syntax.
     """
 
+    __slots__ = ("_out", "_buf", "_append")
+
     _SEGMENT_MAP = {
         "CONST": "constant",
         "ARG": "argument",
@@ -23,37 +26,47 @@ class VMWriter:
         "THAT": "that",
         "POINTER": "pointer",
         "TEMP": "temp",
-
-        "constant": "constant",
-        "argument": "argument",
-        "local": "local",
-        "static": "static",
-        "this": "this",
-        "that": "that",
-        "pointer": "pointer",
-        "temp": "temp",
     }
 
-    _ARITHMETIC_ALLOWED = {
-        "add", "sub", "neg",
-        "eq", "gt", "lt",
-        "and", "or", "not",
-        "shiftleft", "shiftright",
+    # The VM segment names themselves are accepted too, on a slower path.
+    _VM_SEGMENTS = frozenset(_SEGMENT_MAP.values())
+
+    # Pre-formatted "push <segment> " / "pop <segment> " command prefixes.
+    _PUSH_PREFIX = {seg: f"push {name} " for seg, name in _SEGMENT_MAP.items()}
+    _POP_PREFIX = {seg: f"pop {name} " for seg, name in _SEGMENT_MAP.items()}
+
+    # Allowed arithmetic commands, each mapped to its complete output line.
+    _ARITHMETIC_LINES = {
+        cmd: f"{cmd}\n" for cmd in (
+            "add", "sub", "neg",
+            "eq", "gt", "lt",
+            "and", "or", "not",
+            "shiftleft", "shiftright",
+        )
     }
 
     def __init__(self, output_stream: TextIO) -> None:
-        """Creates a new file and prepares it for writing VM commands."""
+        """Creates a new file and prepares it for writing VM commands.
+        Commands are buffered in memory until ``close`` is called.
+        """
         self._out: TextIO = output_stream
+        self._buf: list[str] = []
+        self._append = self._buf.append
 
-    def write_push(self, segment: str, index: int) -> None:
+    def write_push(self, segment: str, index: int | str) -> None:
         """Writes a VM push command.
 
         Args:
             segment (str): the segment to push to, can be "CONST", "ARG", 
             "LOCAL", "STATIC", "THIS", "THAT", "POINTER", "TEMP"
-            index (int): the index to push to.
+            index (int | str): the index to push to. Its decimal text is
+            accepted as well, so integer constants can be pushed straight
+            from their (already normalized) token.
         """
-        self._write("push", self._translate_segment(segment), index)
+        prefix = self._PUSH_PREFIX.get(segment)
+        if prefix is None:
+            prefix = self._vm_segment_prefix("push", segment)
+        self._append(f"{prefix}{index}\n")
 
     def write_pop(self, segment: str, index: int) -> None:
         """Writes a VM pop command.
@@ -63,7 +76,10 @@ class VMWriter:
             "LOCAL", "STATIC", "THIS", "THAT", "POINTER", "TEMP".
             index (int): the index to pop from.
         """
-        self._write("pop", self._translate_segment(segment), index)
+        prefix = self._POP_PREFIX.get(segment)
+        if prefix is None:
+            prefix = self._vm_segment_prefix("pop", segment)
+        self._append(f"{prefix}{index}\n")
 
     def write_arithmetic(self, command: str) -> None:
         """Writes a VM arithmetic command.
@@ -72,10 +88,10 @@ class VMWriter:
             command (str): the command to write, can be "ADD", "SUB", "NEG", 
             "EQ", "GT", "LT", "AND", "OR", "NOT", "SHIFTLEFT", "SHIFTRIGHT".
         """
-        cmd = command.lower()
-        if cmd not in self._ARITHMETIC_ALLOWED:
+        line = self._ARITHMETIC_LINES.get(command.lower())
+        if line is None:
             raise ValueError(f"Illegal arithmetic command: {command}")
-        self._write(cmd)
+        self._append(line)
 
     def write_label(self, label: str) -> None:
         """Writes a VM label command.
@@ -83,7 +99,7 @@ class VMWriter:
         Args:
             label (str): the label to write.
         """
-        self._write("label", label)
+        self._append(f"label {label}\n")
 
     def write_goto(self, label: str) -> None:
         """Writes a VM goto command.
@@ -91,7 +107,7 @@ class VMWriter:
         Args:
             label (str): the label to go to.
         """
-        self._write("goto", label)
+        self._append(f"goto {label}\n")
 
     def write_if(self, label: str) -> None:
         """Writes a VM if-goto command.
@@ -99,7 +115,7 @@ class VMWriter:
         Args:
             label (str): the label to go to.
         """
-        self._write("if-goto", label)
+        self._append(f"if-goto {label}\n")
 
     def write_call(self, name: str, n_args: int) -> None:
         """Writes a VM call command.
@@ -108,7 +124,7 @@ class VMWriter:
             name (str): the name of the function to call.
             n_args (int): the number of arguments the function receives.
         """
-        self._write("call", name, n_args)
+        self._append(f"call {name} {n_args}\n")
 
     def write_function(self, name: str, n_locals: int) -> None:
         """Writes a VM function command.
@@ -117,19 +133,38 @@ class VMWriter:
             name (str): the name of the function.
             n_locals (int): the number of local variables the function uses.
         """
-        self._out.write("\n")
-        self._write("function", name, n_locals)
+        self._append(f"\nfunction {name} {n_locals}\n")
 
     def write_return(self) -> None:
         """Writes a VM return command."""
-        self._write("return")
+        self._append("return\n")
 
-    def _translate_segment(self, seg: str) -> str:
-        try:
-            return self._SEGMENT_MAP[seg]  # fast-path
-        except KeyError:
-            raise ValueError(f"Illegal memory segment: {seg}") from None
+    def write_string(self, text: str) -> None:
+        """Writes the VM commands that build a string constant on the stack:
+        a call to String.new followed by one String.appendChar per character.
+        The whole sequence is formatted up front and written at once.
 
-    def _write(self, *parts: Iterable[typing.Any]) -> None:
-        line = " ".join(str(p) for p in parts if p not in ("", None))
-        self._out.write(f"{line}\n")
+        Args:
+            text (str): the contents of the string constant.
+        """
+        try:
+            # Jack strings are ASCII, so encoding yields the character codes
+            # without an ord() call per character.
+            codes = text.encode("latin-1")
+        except UnicodeEncodeError:
+            codes = map(ord, text)
+        block = "".join(
+            f"push constant {code}\ncall String.appendChar 2\n"
+            for code in codes)
+        self._append(
+            f"push constant {len(text)}\ncall String.new 1\n{block}")
+
+    def close(self) -> None:
+        """Flushes all buffered VM commands to the output file."""
+        self._out.write("".join(self._buf))
+        self._buf.clear()
+
+    def _vm_segment_prefix(self, command: str, segment: str) -> str:
+        if segment not in self._VM_SEGMENTS:
+            raise ValueError(f"Illegal memory segment: {segment}")
+        return f"{command} {segment} "
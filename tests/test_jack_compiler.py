@@ -1,8 +1,10 @@
 import sys, os, io
+import pytest
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from JackTokenizer import JackTokenizer
-from CompilationEngine import CompilationEngine
+from JackTokenizer import JackSyntaxError, JackTokenizer
+from CompilationEngine import CompilationEngine, VMEmitEngine
+from SymbolTable import SymbolTable
 
 
 def test_tokenizer_basic():
@@ -67,3 +69,76 @@ def test_compile_basic_class_pre_advanced():
         "  </class>",
     ]
     assert result == expected
+
+
+def test_compile_string_constant():
+    code = 'class Main { function void main() { do Output.printString("Hi"); return; } }'
+    tokenizer = JackTokenizer(io.StringIO(code))
+    output = io.StringIO()
+    CompilationEngine(tokenizer, output)
+    result = output.getvalue().strip().splitlines()
+    expected = [
+        "function Main.main 0",
+        "push constant 2",
+        "call String.new 1",
+        "push constant 72",
+        "call String.appendChar 2",
+        "push constant 105",
+        "call String.appendChar 2",
+        "call Output.printString 1",
+        "pop temp 0",
+        "push constant 0",
+        "return",
+    ]
+    assert result == expected
+
+
+def test_symbol_table_resolve():
+    table = SymbolTable()
+    table.define("x", "int", "FIELD")
+    table.start_subroutine()
+    table.define("a", "int", "ARG")
+    table.define("x", "Point", "VAR")
+    assert table.resolve("x") == ("LOCAL", 0)
+    assert table.resolve("a") == ("ARG", 0)
+    assert table.resolve_with_type("x") == ("LOCAL", 0, "Point")
+    assert table.resolve("missing") is None
+    table.start_subroutine()
+    assert table.resolve("x") == ("THIS", 0)
+
+
+def test_compile_undefined_variable():
+    code = "class Main { function void main() { let q = 1; return; } }"
+    tokenizer = JackTokenizer(io.StringIO(code))
+    with pytest.raises(JackSyntaxError, match="Undefined variable 'q'"):
+        CompilationEngine(tokenizer, io.StringIO())
+
+
+def test_compile_explicit_mode():
+    code = "class Main { function void main() { return; } }"
+    xml_output = io.StringIO()
+    CompilationEngine(JackTokenizer(io.StringIO(code)), xml_output, mode="xml")
+    assert xml_output.getvalue().startswith("<class>\n")
+
+    primed = JackTokenizer(io.StringIO(code))
+    primed.advance()
+    vm_output = io.StringIO()
+    CompilationEngine(primed, vm_output, mode="vm")
+    assert vm_output.getvalue().strip().splitlines()[0] == "function Main.main 0"
+
+    with pytest.raises(ValueError):
+        VMEmitEngine(JackTokenizer(io.StringIO(code)), io.StringIO(), mode="xml")
+
+
+def test_tokenizer_comments():
+    code = '/** doc\n comment */ let s = "a//b"; // trailing /*\nx / y'
+    tokenizer = JackTokenizer(io.StringIO(code))
+    tokens = []
+    while tokenizer.has_more_tokens():
+        tokenizer.advance()
+        tokens.append((tokenizer.token_type(), tokenizer.get_token_string()))
+    assert tokens == [
+        ("KEYWORD", "let"), ("IDENTIFIER", "s"), ("SYMBOL", "="),
+        ("STRING_CONST", "a//b"), ("SYMBOL", ";"),
+        ("IDENTIFIER", "x"), ("SYMBOL", "/"), ("IDENTIFIER", "y"),
+    ]